@@ -30,6 +30,15 @@ def convert_mm_to_hex(mm):  # Converts from mm to hex
     return Hex(int(mm * 10000), 4)  # resolution 0.1um
 
 
+def convert_hex_to_mm(inputWord_pos):  # Converts the position in a read_pos response from hex to mm
+    y = [inputWord_pos[29], inputWord_pos[28], inputWord_pos[26], inputWord_pos[27],
+         inputWord_pos[24], inputWord_pos[25], inputWord_pos[22], inputWord_pos[23]]  # Change the order of the hex values.
+    dec = int(''.join(y), 16) / float(10000)
+    if dec > 429496:
+        return 0
+    return dec
+
+
 class Driver: # Sends different motion commands from computer to servo drive, and vice versa. This class is all about driving the LinMot drive
     def __init__(self, connection, drive_id='01'):
         self.id = drive_id
@@ -123,8 +132,8 @@ class Driver: # Sends different motion commands from computer to servo drive, an
 
     def read_status(self):
         inputWord = ""
-        while con.in_waiting > 0:
-            inputWord += b16encode(self.connection.read()) # Writes Rx values one by one in byte. (From the servo drive to a PC)
+        while self.connection.in_waiting > 0:
+            inputWord += b16encode(self.connection.read()).decode() # Writes Rx values one by one in byte. (From the servo drive to a PC)
         if not inputWord[-2:] == "04":  # breaking matched 04.
             print('incomplete telegram')
         return inputWord
@@ -147,37 +156,29 @@ class Driver: # Sends different motion commands from computer to servo drive, an
         time.sleep(0.1)
         self.read_status() # reading status on the servo drive
 
-    def read_pos(self): # Reading the actual position of the linMot drive
+    def stop(self): # Switches the servo drive off without waiting for the status, e.g. to abort a running profile
+        self.connection.write(b16decode("01" + self.id + "050200013E0004"))
+
+    def read_pos(self, verbose=True): # Reading the actual position of the linMot drive, returns the position in mm. verbose=False keeps the print out of fast loops
         dataString = "01" + self.id + "0302010004" # Requesting the position of the linMot
-        data = base64.b16decode(dataString)
+        data = b16decode(dataString)
         self.connection.write(data)
         i = 30
 
         inputWord_pos = ""
         while len(inputWord_pos) < 32:
-            inputByte_pos = b16encode(self.connection.read())
+            inputByte_pos = b16encode(self.connection.read()).decode()
             inputWord_pos += inputByte_pos
             #print('RX = ' + inputByte)
-        print('vv ' + inputWord_pos)
-        if inputWord_pos < 29:  # If output value is less than 29 --> "Error"
+        if verbose:
+            print('vv ' + inputWord_pos)
+        if len(inputWord_pos) < 30:  # If the response is shorter than 30 hex digits --> "Error"
             print('Feilmelding')
         else:
-            y1 = inputWord_pos[22]
-            y2 = inputWord_pos[23]
-            y3 = inputWord_pos[24]
-            y4 = inputWord_pos[25]
-            y5 = inputWord_pos[26]
-            y6 = inputWord_pos[27]
-            y7 = inputWord_pos[28]
-            y8 = inputWord_pos[29]
-            y = [y8, y7, y5, y6, y3, y4, y1, y2]  # Change the order of the hex values.
-            str1 = ''.join(y)
-            hex = int(str1, 16)
-            dec = hex / float(10000)
-            if dec > 429496:
-                print(0)
-            else:
+            dec = convert_hex_to_mm(inputWord_pos)
+            if verbose:
                 print(dec)
+            return dec
 
 
 
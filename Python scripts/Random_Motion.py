@@ -21,68 +21,63 @@ NUM_WAYPOINTS = 20 # Number of waypoints # originally 30
 FILE_NAME = "random_motion_profile"
 # --------------------------------------
 
-# Parameters
-min_length = MIN_LENGTH
-max_length = MAX_LENGTH
-sampling_rate = SAMPLING_RATE
-duration_time = DURATION_TIME
-max_velocity = MAX_VELOCITY
-max_acceleration = MAX_ACCELERATION
-num_waypoints = NUM_WAYPOINTS
-random_seed = int(time.time() % 1000)        # Seed for reproducibility
-#delta = (max_length - min_length) * 0.05  # 5% of the range
-delta = 0
-file_name = "../Motion profiles/random_motion/" + FILE_NAME + "_seed_{}_waypoints_{}.csv".format(random_seed, num_waypoints)
-
-# Set random seed
-np.random.seed(random_seed)
-
-# Generate time array
-t = np.arange(0, duration_time, 1 / sampling_rate)
-
-# Generate waypoint times
-waypoint_times = np.linspace(0, duration_time, num_waypoints)
-
-# Generate random positions for waypoints within min+delta and max-delta
-waypoint_positions = np.random.uniform(min_length + delta, max_length - delta, num_waypoints)
-
-# Ensure the first waypoint starts at max_length
-waypoint_positions[0] = max_length # - delta  # Slightly below max to avoid saturation
-
-# Prevent consecutive waypoints at limits
-for i in range(1, num_waypoints):
-    if abs(waypoint_positions[i] - min_length) < delta and abs(waypoint_positions[i-1] - min_length) < delta:
-        waypoint_positions[i] = min_length + delta
-    if abs(waypoint_positions[i] - max_length) < delta and abs(waypoint_positions[i-1] - max_length) < delta:
-        waypoint_positions[i] = max_length - delta
-
-# Create cubic spline interpolation with 'not-a-knot' boundary conditions
-cs = CubicSpline(waypoint_times, waypoint_positions, bc_type=((2, 0.0), 'not-a-knot'))
-
-# Evaluate spline at sampling points
-position = cs(t)
-
-# Ensure positions are within bounds
-position = np.clip(position, min_length, max_length)
-
-# Calculate velocity and acceleration
-velocity = cs(t, 1)  # First derivative
-acceleration = cs(t, 2)  # Second derivative
-
-# Enforce velocity and acceleration constraints
-constraints_violated = (
-    np.any(np.abs(velocity) > max_velocity) or
-    np.any(np.abs(acceleration) > max_acceleration) or
-    np.any(position <= min_length) or
-    np.any(position >= max_length)
-)
-
-if constraints_violated:
-    print("Constraints violated. Adjusting spline...")
-
+def fit_spline(waypoint_times, waypoint_positions):
+    # Create cubic spline interpolation with 'not-a-knot' boundary conditions
+    return CubicSpline(waypoint_times, waypoint_positions, bc_type=((2, 0.0), 'not-a-knot'))
+
+def generate_waypoints(min_length, max_length, duration_time, num_waypoints, delta=0):
+    """
+    Generates random waypoints within the length limits, starting at max_length.
+
+    Parameters:
+    - min_length (float): Minimum position in mm.
+    - max_length (float): Maximum position in mm.
+    - duration_time (float): Duration of the profile in seconds.
+    - num_waypoints (int): Number of waypoints.
+    - delta (float): Margin kept from the limits in mm.
+
+    Returns:
+    - waypoint_times (numpy.ndarray): Equally spaced waypoint times.
+    - waypoint_positions (numpy.ndarray): Random waypoint positions.
+    """
+    # Generate waypoint times
+    waypoint_times = np.linspace(0, duration_time, num_waypoints)
+
+    # Generate random positions for waypoints within min+delta and max-delta
+    waypoint_positions = np.random.uniform(min_length + delta, max_length - delta, num_waypoints)
+
+    # Ensure the first waypoint starts at max_length
+    waypoint_positions[0] = max_length # - delta  # Slightly below max to avoid saturation
+
+    # Prevent consecutive waypoints at limits
+    for i in range(1, num_waypoints):
+        if abs(waypoint_positions[i] - min_length) < delta and abs(waypoint_positions[i-1] - min_length) < delta:
+            waypoint_positions[i] = min_length + delta
+        if abs(waypoint_positions[i] - max_length) < delta and abs(waypoint_positions[i-1] - max_length) < delta:
+            waypoint_positions[i] = max_length - delta
+
+    return waypoint_times, waypoint_positions
+
+def repair_waypoints(t, waypoint_times, waypoint_positions, min_length, max_length, max_velocity, max_acceleration, delta=0):
+    """
+    Adjusts the waypoints with L-BFGS-B so that the spline respects the position, velocity and acceleration limits.
+
+    Parameters:
+    - t (numpy.ndarray): Time array the spline is checked on.
+    - waypoint_times (numpy.ndarray): Waypoint times.
+    - waypoint_positions (numpy.ndarray): Waypoint positions to start from.
+    - min_length (float): Minimum position in mm.
+    - max_length (float): Maximum position in mm.
+    - max_velocity (float): Velocity limit in mm/s.
+    - max_acceleration (float): Acceleration limit in mm/s².
+    - delta (float): Margin kept from the limits in mm.
+
+    Returns:
+    - waypoint_positions (numpy.ndarray): Adjusted waypoint positions.
+    """
     # Define objective function to minimize constraint violations
     def objective(waypoint_positions):
-        cs = CubicSpline(waypoint_times, waypoint_positions, bc_type=((2, 0.0), 'not-a-knot'))
+        cs = fit_spline(waypoint_times, waypoint_positions)
         pos = cs(t)
         vel = cs(t, 1)
         accel = cs(t, 2)
@@ -108,9 +103,6 @@ if constraints_violated:
     # Bounds for optimization (min_length + delta to max_length - delta for each waypoint)
     bounds = [(min_length + delta, max_length - delta) for _ in waypoint_positions]
 
-    # Constraints to prevent waypoints at exact limits
-    constraints = []
-
     # Run optimization to adjust waypoints
     result = minimize(
         objective,
@@ -121,53 +113,127 @@ if constraints_violated:
     )
 
     # Use optimized waypoints
-    waypoint_positions = result.x
-
-    # Recompute spline with adjusted waypoints
-    cs = CubicSpline(waypoint_times, waypoint_positions, bc_type=((2, 0.0), 'not-a-knot'))
+    return result.x
+
+def generate_random_motion(min_length, max_length, sampling_rate, duration_time, max_velocity, max_acceleration, num_waypoints, delta=0):
+    """
+    Generates a random smooth position profile through random waypoints, repairing the waypoints
+    when the spline breaks the limits.
+
+    Parameters:
+    - min_length (float): Minimum position in mm.
+    - max_length (float): Maximum position in mm.
+    - sampling_rate (float): Number of samples per second (Hz).
+    - duration_time (float): Duration of the profile in seconds.
+    - max_velocity (float): Velocity limit in mm/s.
+    - max_acceleration (float): Acceleration limit in mm/s².
+    - num_waypoints (int): Number of waypoints.
+    - delta (float): Margin kept from the limits in mm.
+
+    Returns:
+    - t (numpy.ndarray): Time array.
+    - position (numpy.ndarray): Position array, clipped to the limits.
+    - velocity (numpy.ndarray): Velocity array.
+    - acceleration (numpy.ndarray): Acceleration array.
+    - cs (scipy.interpolate.CubicSpline): Spline the profile was sampled from.
+    """
+    # Generate time array
+    t = np.arange(0, duration_time, 1 / sampling_rate)
+
+    waypoint_times, waypoint_positions = generate_waypoints(min_length, max_length, duration_time, num_waypoints, delta)
+
+    cs = fit_spline(waypoint_times, waypoint_positions)
+
+    # Evaluate spline at sampling points
     position = cs(t)
+
+    # Ensure positions are within bounds
     position = np.clip(position, min_length, max_length)
-    velocity = cs(t, 1)
-    acceleration = cs(t, 2)
-
-# Plot position over time
-plt.figure(figsize=(12, 8))
-
-plt.subplot(3, 1, 1)
-plt.plot(t, position, label='Position')
-plt.title('Position vs. Time')
-plt.ylabel('Position (mm)')
-plt.grid(True)
-plt.legend()
-
-# Plot velocity over time
-plt.subplot(3, 1, 2)
-plt.plot(t, velocity, label='Velocity')
-plt.title('Velocity vs. Time')
-plt.ylabel('Velocity (mm/s)')
-plt.grid(True)
-plt.legend()
-
-# Plot acceleration over time
-plt.subplot(3, 1, 3)
-plt.plot(t, acceleration, label='Acceleration')
-plt.title('Acceleration vs. Time')
-plt.xlabel('Time (s)')
-plt.ylabel('Acceleration (mm/s²)')
-plt.grid(True)
-plt.legend()
-
-plt.tight_layout()
-plt.show()
-
-# Check constraints
-print(f"Max position: {np.max(np.abs(position)):.2f} mm")
-print(f"Min position: {np.min(np.abs(position)):.2f} mm")
-print(f"Max velocity: {np.max(np.abs(velocity)):.2f} mm/s")
-print(f"Max acceleration: {np.max(np.abs(acceleration)):.2f} mm/s²")
-
-# Save position data to CSV file (only one column)
-np.savetxt(file_name, position, delimiter=',', fmt='%.6f')
-
-# Print the latest time
-print(f"Latest time: {t[-1]:.3f} seconds")
\ No newline at end of file
+
+    # Calculate velocity and acceleration
+    velocity = cs(t, 1)  # First derivative
+    acceleration = cs(t, 2)  # Second derivative
+
+    # Enforce velocity and acceleration constraints
+    constraints_violated = (
+        np.any(np.abs(velocity) > max_velocity) or
+        np.any(np.abs(acceleration) > max_acceleration) or
+        np.any(position <= min_length) or
+        np.any(position >= max_length)
+    )
+
+    if constraints_violated:
+        print("Constraints violated. Adjusting spline...")
+
+        waypoint_positions = repair_waypoints(t, waypoint_times, waypoint_positions, min_length, max_length, max_velocity, max_acceleration, delta)
+
+        # Recompute spline with adjusted waypoints
+        cs = fit_spline(waypoint_times, waypoint_positions)
+        position = cs(t)
+        position = np.clip(position, min_length, max_length)
+        velocity = cs(t, 1)
+        acceleration = cs(t, 2)
+
+    return t, position, velocity, acceleration, cs
+
+# Example usage
+if __name__ == "__main__":
+    # Parameters
+    min_length = MIN_LENGTH
+    max_length = MAX_LENGTH
+    sampling_rate = SAMPLING_RATE
+    duration_time = DURATION_TIME
+    max_velocity = MAX_VELOCITY
+    max_acceleration = MAX_ACCELERATION
+    num_waypoints = NUM_WAYPOINTS
+    random_seed = int(time.time() % 1000)        # Seed for reproducibility
+    #delta = (max_length - min_length) * 0.05  # 5% of the range
+    delta = 0
+    file_name = "../Motion profiles/random_motion/" + FILE_NAME + "_seed_{}_waypoints_{}.csv".format(random_seed, num_waypoints)
+
+    # Set random seed
+    np.random.seed(random_seed)
+
+    t, position, velocity, acceleration, cs = generate_random_motion(min_length, max_length, sampling_rate, duration_time, max_velocity, max_acceleration, num_waypoints, delta)
+
+    # Plot position over time
+    plt.figure(figsize=(12, 8))
+
+    plt.subplot(3, 1, 1)
+    plt.plot(t, position, label='Position')
+    plt.title('Position vs. Time')
+    plt.ylabel('Position (mm)')
+    plt.grid(True)
+    plt.legend()
+
+    # Plot velocity over time
+    plt.subplot(3, 1, 2)
+    plt.plot(t, velocity, label='Velocity')
+    plt.title('Velocity vs. Time')
+    plt.ylabel('Velocity (mm/s)')
+    plt.grid(True)
+    plt.legend()
+
+    # Plot acceleration over time
+    plt.subplot(3, 1, 3)
+    plt.plot(t, acceleration, label='Acceleration')
+    plt.title('Acceleration vs. Time')
+    plt.xlabel('Time (s)')
+    plt.ylabel('Acceleration (mm/s²)')
+    plt.grid(True)
+    plt.legend()
+
+    plt.tight_layout()
+    plt.show()
+
+    # Check constraints
+    print(f"Max position: {np.max(np.abs(position)):.2f} mm")
+    print(f"Min position: {np.min(np.abs(position)):.2f} mm")
+    print(f"Max velocity: {np.max(np.abs(velocity)):.2f} mm/s")
+    print(f"Max acceleration: {np.max(np.abs(acceleration)):.2f} mm/s²")
+
+    # Save position data to CSV file (only one column)
+    np.savetxt(file_name, position, delimiter=',', fmt='%.6f')
+
+    # Print the latest time
+    print(f"Latest time: {t[-1]:.3f} seconds")
\ No newline at end of file
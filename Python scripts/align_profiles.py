@@ -0,0 +1,213 @@
+import os
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy.fft import rfft, irfft, next_fast_len
+
+# ------------CHANGE HERE---------------
+COMMANDED_FILE = "motion_profile_100mms.csv"
+COMMANDED_SAMPLING_RATE = 100  # Hz, used when the profile has no time column
+MEASURED_FILE = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/Experiments data/241127/Force Length/8kv.csv"
+RESAMPLING_RATE = 1000  # Hz, common grid for commanded and measured position
+MAX_LAG = None  # seconds, None to search every possible offset
+# --------------------------------------
+
+TIME_COLUMN = "Time(s)"
+POSITION_COLUMN = "MC SW Overview - Actual Position(mm)"
+
+
+def load_commanded_profile(file_name, sampling_rate):
+    """
+    Loads a commanded motion profile written by one of the generators.
+
+    Parameters:
+    - file_name (str): CSV file with either a single position column (Force_Velocity, Random_Motion)
+      or the Time,Position,Velocity,Acceleration columns with header (Force_Velocity_Random).
+    - sampling_rate (float): Sampling rate of the profile (Hz), used when there is no time column.
+
+    Returns:
+    - time (numpy.ndarray): Time array in seconds.
+    - position (numpy.ndarray): Commanded position array in mm.
+    """
+    with open(file_name) as f:
+        first_line = f.readline()
+    try:
+        float(first_line.split(',')[0])
+        skip_rows = 0
+    except ValueError:
+        skip_rows = 1  # header line
+
+    data = np.loadtxt(file_name, delimiter=',', skiprows=skip_rows, ndmin=2)
+    if data.shape[1] == 1:
+        position = data[:, 0]
+        time = np.arange(len(position)) / sampling_rate
+    else:
+        time = data[:, 0]
+        position = data[:, 1]
+
+    return time, position
+
+
+def load_measured_recording(file_name):
+    """
+    Loads the actual position from a LinMot oscilloscope CSV export.
+
+    Parameters:
+    - file_name (str): CSV file exported from LinMot-Talk.
+
+    Returns:
+    - time (numpy.ndarray): Time array in seconds.
+    - position (numpy.ndarray): Measured position array in mm.
+    """
+    df = pd.read_csv(file_name, usecols=[TIME_COLUMN, POSITION_COLUMN])
+    return df[TIME_COLUMN].to_numpy(dtype=float), df[POSITION_COLUMN].to_numpy(dtype=float)
+
+
+def resample(time, values, sampling_rate):
+    """
+    Linearly resamples a signal onto a uniform grid starting at its first sample.
+
+    Parameters:
+    - time (numpy.ndarray): Monotonic time array in seconds.
+    - values (numpy.ndarray): Signal values at the given times.
+    - sampling_rate (float): Rate of the output grid (Hz).
+
+    Returns:
+    - grid (numpy.ndarray): Uniform time array.
+    - resampled (numpy.ndarray): Signal values on the grid.
+    """
+    grid = time[0] + np.arange(int(np.floor((time[-1] - time[0]) * sampling_rate)) + 1) / sampling_rate
+    return grid, np.interp(grid, time, values)
+
+
+def find_lag(reference, signal, min_lag=None, max_lag=None, min_overlap=0.25):
+    """
+    Finds the shift of signal relative to reference in O(n log n).
+
+    For every lag the mean squared difference over the overlapping samples is computed from an FFT
+    cross-correlation and cumulative sums of squares. Unlike the raw correlation peak, this is not
+    biased towards lags with a large overlap.
+
+    Parameters:
+    - reference (numpy.ndarray): Uniformly sampled reference signal.
+    - signal (numpy.ndarray): Signal sampled on the same grid spacing as the reference.
+    - min_lag (int or None): Smallest lag to consider in samples, None for no lower bound.
+    - max_lag (int or None): Largest lag to consider in samples, None for no upper bound.
+    - min_overlap (float): Smallest overlap to consider, as a fraction of the shorter signal.
+
+    Returns:
+    - lag (int): Number of samples such that signal[k + lag] best matches reference[k].
+    """
+    # A common offset does not change the differences and keeps the sums of squares small
+    offset = np.mean(reference)
+    reference = reference - offset
+    signal = signal - offset
+
+    # Zero padding to at least len(signal) + len(reference) - 1 avoids circular wrap-around
+    n = next_fast_len(len(signal) + len(reference) - 1, real=True)
+    correlation = irfft(rfft(signal, n) * np.conj(rfft(reference, n)), n)
+
+    # Negative lags wrap around to the end of the correlation array
+    lags = np.arange(1 - len(reference), len(signal))
+    correlation = correlation[lags]
+
+    # Overlap for each lag: reference[start:stop] against signal[start + lag:stop + lag]
+    start = np.maximum(0, -lags)
+    stop = np.minimum(len(reference), len(signal) - lags)
+    overlap = stop - start
+    reference_energy = np.concatenate(([0.0], np.cumsum(reference**2)))
+    signal_energy = np.concatenate(([0.0], np.cumsum(signal**2)))
+    squared_error = (reference_energy[stop] - reference_energy[start]
+                     + signal_energy[stop + lags] - signal_energy[start + lags] - 2 * correlation)
+
+    valid = overlap >= min_overlap * min(len(reference), len(signal))
+    if min_lag is not None:
+        valid &= lags >= min_lag
+    if max_lag is not None:
+        valid &= lags <= max_lag
+    if not np.any(valid):
+        raise ValueError("No lag between {} and {} samples overlaps both signals enough".format(min_lag, max_lag))
+
+    return int(lags[valid][np.argmin(squared_error[valid] / overlap[valid])])
+
+
+def align_profiles(commanded_time, commanded_position, measured_time, measured_position, sampling_rate, max_lag=None):
+    """
+    Resamples commanded and measured position to a common grid, removes the offset between them
+    and computes tracking-error statistics over the overlapping part.
+
+    Parameters:
+    - commanded_time (numpy.ndarray): Time array of the commanded profile in seconds.
+    - commanded_position (numpy.ndarray): Commanded position in mm.
+    - measured_time (numpy.ndarray): Time array of the measured recording in seconds.
+    - measured_position (numpy.ndarray): Measured position in mm.
+    - sampling_rate (float): Rate of the common grid (Hz).
+    - max_lag (float or None): Largest absolute offset to search in seconds, None for all offsets.
+
+    Returns:
+    - result (dict): Aligned arrays ('time', 'commanded', 'measured', 'error'), the offset of the
+      measured recording ('lag' in seconds) and tracking-error statistics ('mean_error', 'std_error',
+      'rms_error', 'max_abs_error') in mm.
+    """
+    _, commanded = resample(commanded_time, commanded_position, sampling_rate)
+    _, measured = resample(measured_time, measured_position, sampling_rate)
+
+    # The grids start at each signal's first sample, so the reported offset is the grid lag plus the start difference
+    start_offset = measured_time[0] - commanded_time[0]
+    if max_lag is None:
+        lag = find_lag(commanded, measured)
+    else:
+        lag = find_lag(commanded, measured,
+                       int(np.ceil((-max_lag - start_offset) * sampling_rate)),
+                       int(np.floor((max_lag - start_offset) * sampling_rate)))
+
+    # Overlapping part: commanded[k] is matched with measured[k + lag]
+    start = max(0, -lag)
+    stop = min(len(commanded), len(measured) - lag)
+    if stop <= start:
+        raise ValueError("Commanded profile and measured recording do not overlap")
+    commanded = commanded[start:stop]
+    measured = measured[start + lag:stop + lag]
+    error = measured - commanded
+
+    return {
+        'time': np.arange(start, stop) / sampling_rate,
+        'commanded': commanded,
+        'measured': measured,
+        'error': error,
+        'lag': lag / sampling_rate + start_offset,
+        'mean_error': np.mean(error),
+        'std_error': np.std(error),
+        'rms_error': np.sqrt(np.mean(error**2)),
+        'max_abs_error': np.max(np.abs(error)),
+    }
+
+
+# Example usage
+if __name__ == "__main__":
+    commanded_time, commanded_position = load_commanded_profile(COMMANDED_FILE, COMMANDED_SAMPLING_RATE)
+    measured_time, measured_position = load_measured_recording(MEASURED_FILE)
+
+    result = align_profiles(commanded_time, commanded_position, measured_time, measured_position, RESAMPLING_RATE, MAX_LAG)
+
+    print("Measured recording lags the profile by {:.3f} s".format(result['lag']))
+    print("Tracking error: mean {:.4f} mm, std {:.4f} mm, RMS {:.4f} mm, max {:.4f} mm".format(
+        result['mean_error'], result['std_error'], result['rms_error'], result['max_abs_error']))
+
+    # Plot aligned position and tracking error vs. time
+    fig, axs = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+
+    axs[0].plot(result['time'], result['commanded'], label='Commanded', color='blue')
+    axs[0].plot(result['time'], result['measured'], label='Measured', color='red')
+    axs[0].set_ylabel('Position (mm)')
+    axs[0].grid(True)
+    axs[0].legend()
+
+    axs[1].plot(result['time'], result['error'], label='Tracking error', color='green')
+    axs[1].set_xlabel('Time (s)')
+    axs[1].set_ylabel('Error (mm)')
+    axs[1].grid(True)
+    axs[1].legend()
+
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,192 @@
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from base64 import b16encode, b16decode
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # the generators import pyplot, nothing is shown here
+
+import Force_Velocity
+import Force_Velocity_Random
+import Random_Motion
+from LinRS_sample import Driver, convert_hex_to_mm
+
+# ------------CHANGE HERE---------------
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+SAVE_BASELINE = False  # True to store this run as the new baseline
+REPEAT = 3  # timing repetitions, the median is compared
+MIN_TIME = 0.2  # seconds, each repetition loops the benchmark at least this long
+REGRESSION_THRESHOLD = 0.2  # flag benchmarks more than 20% slower or larger than the baseline
+# --------------------------------------
+
+MIN_LENGTH = 27.33  # mm
+MAX_LENGTH = 39.922  # mm
+
+
+class LoopbackConnection:
+    """Stand-in for the serial port: swallows telegrams and answers every read with a fixed position response."""
+    def __init__(self, position):
+        # read_pos takes the position from hex digits 22-29 of the response, in swapped order
+        digits = '{:08X}'.format(int(position * 10000))
+        word = ['0'] * 32
+        for i, j in zip((29, 28, 26, 27, 24, 25, 22, 23), range(8)):
+            word[i] = digits[j]
+        self.response = b16decode(''.join(word))
+        self.index = 0
+
+    def write(self, data):
+        self.index = 0
+
+    def read(self):
+        byte = self.response[self.index:self.index + 1]
+        self.index += 1
+        return byte
+
+
+def write_experiment_csv(file_name, num_rows):
+    # Same columns as a LinMot oscilloscope export
+    t = np.arange(num_rows) / 1000
+    df = pd.DataFrame({
+        "Time(s)": t,
+        "MC SW Overview - Actual Position(mm)": 45 + 7 * np.sin(t),
+        "MC SW Overview - Actual Velocity(m/s)": 0.007 * np.cos(t),
+        "MC SW Force Control - Measured Force(N)": 20 + 5 * np.sin(3 * t),
+    })
+    df.to_csv(file_name, index=False)
+
+
+def load_experiment_csv(file_name):
+    # Loading as done in plot_experiment_data.py
+    df = pd.read_csv(file_name)
+    return (df["Time(s)"], df["MC SW Overview - Actual Position(mm)"],
+            df["MC SW Overview - Actual Velocity(m/s)"], df["MC SW Force Control - Measured Force(N)"])
+
+
+def read_positions(driver, num_reads):
+    with contextlib.redirect_stdout(io.StringIO()):  # read_pos prints every response
+        for _ in range(num_reads):
+            driver.read_pos()
+
+
+def random_motion_repair(num_waypoints):
+    # Fixed seed so every run repairs the same waypoints
+    np.random.seed(num_waypoints)
+    t = np.arange(0, Random_Motion.DURATION_TIME, 1 / Random_Motion.SAMPLING_RATE)
+    waypoint_times, waypoint_positions = Random_Motion.generate_waypoints(MIN_LENGTH, MAX_LENGTH, Random_Motion.DURATION_TIME, num_waypoints)
+    return lambda: Random_Motion.repair_waypoints(t, waypoint_times, waypoint_positions.copy(), MIN_LENGTH, MAX_LENGTH,
+                                                  Random_Motion.MAX_VELOCITY, Random_Motion.MAX_ACCELERATION)
+
+
+def collect_benchmarks(data_dir):
+    """Returns benchmark name -> function without arguments, all running offline on synthetic data."""
+    benchmarks = {}
+
+    for num_velocities in (1, 9, 36):
+        for sampling_rate in (100, 1000):
+            velocities = np.linspace(10, 100, num_velocities)
+            benchmarks['force_velocity[{}x{}Hz]'.format(num_velocities, sampling_rate)] = (
+                lambda v=velocities, fs=sampling_rate: Force_Velocity.generate_motion_profile(
+                    Force_Velocity.MIN_LENGTH, Force_Velocity.MAX_LENGTH, v, fs, Force_Velocity.REST_PERIOD, Force_Velocity.CRUISE_FRACTION))
+
+    for sampling_rate in (100, 1000):
+        benchmarks['force_velocity_random[{}Hz]'.format(sampling_rate)] = (
+            lambda fs=sampling_rate: Force_Velocity_Random.generate_motion_profile(
+                Force_Velocity_Random.MIN_LENGTH, Force_Velocity_Random.MAX_LENGTH, fs, Force_Velocity_Random.REST_PERIOD))
+
+    for num_waypoints in (20, 35, 50, 65, 80):
+        benchmarks['random_motion_repair[{}]'.format(num_waypoints)] = random_motion_repair(num_waypoints)
+
+    driver = Driver(LoopbackConnection(45.1234), '01')
+    positions = np.random.uniform(MIN_LENGTH, MAX_LENGTH, 1000).tolist()
+    response = b16encode(driver.connection.response).decode()
+    benchmarks['telegram_encode[1000]'] = lambda: [driver.telegramPstream(x) for x in positions]
+    benchmarks['telegram_decode[1000]'] = lambda: [convert_hex_to_mm(response) for _ in range(1000)]
+    benchmarks['read_pos_loopback[1000]'] = lambda: read_positions(driver, 1000)
+
+    for num_rows in (10000, 100000):
+        file_name = os.path.join(data_dir, 'experiment_{}.csv'.format(num_rows))
+        write_experiment_csv(file_name, num_rows)
+        benchmarks['load_csv[{}]'.format(num_rows)] = lambda f=file_name: load_experiment_csv(f)
+
+    return benchmarks
+
+
+def measure(function):
+    """
+    Times a benchmark and measures its peak memory.
+
+    Returns:
+    - result (dict): Median and minimum time per call in seconds, peak traced memory in bytes.
+    """
+    # Calibrate the number of calls per repetition like timeit.Timer.autorange
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        number *= 10 if elapsed < MIN_TIME / 10 else 2
+
+    times = [elapsed / number]
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'time': statistics.median(times), 'min_time': min(times), 'peak_memory': peak}
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of (benchmark, metric, baseline value, new value) for every regression."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ('time', 'peak_memory'):
+            if result[metric] > baseline[name][metric] * (1 + threshold):
+                regressions.append((name, metric, baseline[name][metric], result[metric]))
+    return regressions
+
+
+# Example usage
+if __name__ == "__main__":
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name, function in collect_benchmarks(data_dir).items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = measure(function)
+            change = ''
+            if name in baseline:
+                change = '{:+.1f}%'.format(100 * (results[name]['time'] / baseline[name]['time'] - 1))
+            print("{:32s} {:12.3f} ms {:12.1f} KiB {:>8s}".format(name, results[name]['time'] * 1000, results[name]['peak_memory'] / 1024, change))
+
+    if SAVE_BASELINE:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(results, f, indent=2)
+        print("Baseline saved to {}".format(BASELINE_FILE))
+    elif baseline:
+        regressions = compare(results, baseline, REGRESSION_THRESHOLD)
+        for name, metric, old, new in regressions:
+            print("REGRESSION {} {}: {:.4g} -> {:.4g}".format(name, metric, old, new))
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,160 @@
+import threading
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from telemetry_recorder import RECORDING_RATE, iter_chunks
+from trajectory_interpolator import BAUD_RATE, BITS_PER_BYTE, POSITION_READ_BYTES
+
+# ------------CHANGE HERE---------------
+RECORDING_FILE = "telemetry.lmrec"  # followed while TelemetryRecorder writes it
+SAMPLING_RATE = RECORDING_RATE  # Hz, rate of the followed recording
+WINDOW = 5  # seconds shown at full rate
+HISTORY_DECIMATION = 50  # every n-th sample goes to the history view
+FPS = 30
+POSITION_LIMITS = (25, 55)  # mm
+VELOCITY_LIMITS = (-0.25, 0.25)  # m/s
+FORCE_LIMITS = (-10, 60)  # N
+# --------------------------------------
+
+CHANNELS = ('position', 'velocity', 'force')
+
+
+class RingBuffer:
+    """
+    Fixed-size circular buffer of several channels.
+
+    Every sample is stored twice, capacity apart, so the latest capacity samples are always one
+    contiguous slice and can be drawn without copying.
+    """
+    def __init__(self, capacity, num_channels):
+        self.capacity = capacity
+        self.data = np.full((num_channels, 2 * capacity), np.nan)
+        self.head = 0  # index of the oldest sample
+
+    def append(self, values):
+        self.data[:, self.head] = values
+        self.data[:, self.head + self.capacity] = values
+        self.head = (self.head + 1) % self.capacity
+
+    def extend(self, block):
+        """Appends a (num_channels, n) block of samples."""
+        block = block[:, -self.capacity:]
+        index = (self.head + np.arange(block.shape[1])) % self.capacity
+        self.data[:, index] = block
+        self.data[:, index + self.capacity] = block
+        self.head = (self.head + block.shape[1]) % self.capacity
+
+    def window(self):
+        """Returns a view of all channels from the oldest to the newest sample."""
+        return self.data[:, self.head:self.head + self.capacity]
+
+
+class LiveDashboard:
+    """
+    Blitted live plot of position, velocity and force with a recent full-rate window and a decimated history.
+
+    Acquisition threads call push or push_block; the GUI thread only reads the buffers.
+    """
+    def __init__(self, sampling_rate=SAMPLING_RATE, window=WINDOW, history_decimation=HISTORY_DECIMATION,
+                 limits=(POSITION_LIMITS, VELOCITY_LIMITS, FORCE_LIMITS)):
+        capacity = int(window * sampling_rate)
+        self.recent = RingBuffer(capacity, len(CHANNELS))
+        self.history = RingBuffer(capacity, len(CHANNELS))
+        self.history_decimation = history_decimation
+        self.num_samples = 0
+
+        # Fixed x axes: time relative to the newest sample
+        recent_time = (np.arange(capacity) - capacity + 1) / sampling_rate
+        history_time = recent_time * history_decimation
+
+        self.fig, axs = plt.subplots(len(CHANNELS), 2, figsize=(14, 9), sharex='col')
+        self.lines = []
+        labels = ('Position (mm)', 'Velocity (m/s)', 'Force (N)')
+        colors = ('blue', 'green', 'red')
+        for row, (label, color, ylim) in enumerate(zip(labels, colors, limits)):
+            for col, x in enumerate((recent_time, history_time)):
+                ax = axs[row, col]
+                line, = ax.plot(x, np.full(capacity, np.nan), color=color, animated=True)
+                ax.set_xlim(x[0], x[-1])
+                ax.set_ylim(*ylim)
+                ax.grid(True)
+                self.lines.append(line)
+            axs[row, 0].set_ylabel(label)
+        axs[0, 0].set_title('Last {} s'.format(window))
+        axs[0, 1].set_title('Last {} s (every {}th sample)'.format(window * history_decimation, history_decimation))
+        axs[-1, 0].set_xlabel('Time (s)')
+        axs[-1, 1].set_xlabel('Time (s)')
+        self.fig.tight_layout()
+
+    def push(self, position, velocity=np.nan, force=np.nan):
+        values = (position, velocity, force)
+        self.recent.append(values)
+        if self.num_samples % self.history_decimation == 0:
+            self.history.append(values)
+        self.num_samples += 1
+
+    def push_block(self, samples):
+        """Appends a structured array of samples, e.g. a chunk read with telemetry_recorder.iter_chunks."""
+        block = np.vstack([samples[channel] for channel in CHANNELS])
+        self.recent.extend(block)
+        first = -self.num_samples % self.history_decimation
+        self.history.extend(block[:, first::self.history_decimation])
+        self.num_samples += block.shape[1]
+
+    def start_source(self, target, *args):
+        """Runs an acquisition function target(dashboard, stop, *args) in a background thread."""
+        self.stop = threading.Event()
+        thread = threading.Thread(target=target, args=(self, self.stop) + args, daemon=True)
+        thread.start()
+        return thread
+
+    def _draw(self, frame):
+        recent = self.recent.window()
+        history = self.history.window()
+        for i in range(len(CHANNELS)):
+            self.lines[2 * i].set_ydata(recent[i])
+            self.lines[2 * i + 1].set_ydata(history[i])
+        return self.lines
+
+    def run(self, fps=FPS):
+        self.animation = FuncAnimation(self.fig, self._draw, interval=1000 / fps, blit=True, cache_frame_data=False)
+        plt.show()
+        if hasattr(self, 'stop'):
+            self.stop.set()
+
+
+def follow_recording(dashboard, stop, file_name, poll_interval=0.05):
+    """Feeds the dashboard with chunks appended to a TelemetryRecorder file, waiting for the file to appear."""
+    offset = 0
+    while not stop.is_set():
+        try:
+            for samples, offset in iter_chunks(file_name, offset):
+                dashboard.push_block(samples)
+        except FileNotFoundError:
+            pass  # recorder not started yet
+        time.sleep(poll_interval)
+
+
+def poll_drive(dashboard, stop, driver, sampling_rate, spin_time=0.002):
+    """Feeds the dashboard with positions read from the drive at sampling_rate (Hz)."""
+    max_rate = getattr(driver.connection, 'baudrate', BAUD_RATE) / (BITS_PER_BYTE * POSITION_READ_BYTES)
+    if sampling_rate > max_rate:
+        raise ValueError("Sampling rate {} Hz exceeds the {:.0f} Hz the serial link carries".format(sampling_rate, max_rate))
+    tick = time.perf_counter()
+    while not stop.is_set():
+        tick += 1 / sampling_rate
+        dashboard.push(driver.read_pos(verbose=False))
+        # Sleep for most of the interval so the GUI thread gets the GIL, then poll for the exact time
+        remaining = tick - time.perf_counter()
+        if remaining > spin_time:
+            time.sleep(remaining - spin_time)
+        while time.perf_counter() < tick:
+            pass
+
+
+# Example usage
+if __name__ == "__main__":
+    dashboard = LiveDashboard()
+    dashboard.start_source(follow_recording, RECORDING_FILE)
+    dashboard.run()
@@ -0,0 +1,317 @@
+import os
+import re
+import numpy as np
+
+# ------------CHANGE HERE---------------
+CONFIG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/Linmot config files"
+CONFIG_FILES = ["Force_Velocity.lmc"]
+PROFILE_FILES = ["motion_profile_100mms.csv"]  # single position column, as written by the generators
+SAMPLING_RATE = 100  # Hz
+OUTPUT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/Linmot config files/generated"
+# --------------------------------------
+
+# .lmc files are a flat stream of space separated tokens:
+#   [D /Key value ... ]   dictionary
+#   [A value ... ]        array
+#   [R schema values ]    record, schema is a dictionary or @N referring to the N-th container (1-based)
+#   'text'                string, with @' and @@ escapes (kept in on-disk form)
+#   #0 #1                 booleans, @0 is an empty reference
+ENCODING = 'latin-1'  # strings hold raw binary data
+TOKEN = re.compile(r"'(?:@.|[^'@])*'|[^ ]+", re.DOTALL)
+INTEGER = re.compile(r"-?\d+$")
+POSITION_SCALE = 10000  # curve setpoints are stored in 0.1 um
+TIME_SCALE = 100000  # curve length is stored in 10 us
+
+
+class Record:
+    """[R ...] entry: a value array described by a schema dictionary that several records may share."""
+    def __init__(self, schema, values):
+        self.schema = schema
+        self.values = values
+
+    def __repr__(self):
+        return "Record({!r})".format(self.values)
+
+
+class LmcFloat(float):
+    """Float that remembers how it was written, so unmodified values round-trip exactly."""
+    def __new__(cls, text):
+        value = super().__new__(cls, text)
+        value.text = text
+        return value
+
+
+def quote(text):
+    """Returns text in on-disk string form, e.g. for a new curve name."""
+    return text.replace("@", "@@").replace("'", "@'")
+
+
+def parse_lmc(text):
+    """
+    Parses the contents of an .lmc file.
+
+    Parameters:
+    - text (str): File contents decoded with ENCODING.
+
+    Returns:
+    - tree: Nested dicts, lists and Record objects mirroring the file.
+    """
+    containers = [None]  # container number -> object, @0 is the empty reference
+    stack = []  # [container, pending dictionary key]
+    root = None
+
+    for match in TOKEN.finditer(text):
+        token = match.group()
+
+        if token[0] == '[':
+            kind = token[1:]
+            if kind == 'D':
+                value = {}
+            elif kind == 'A':
+                value = []
+            elif kind == 'R':
+                value = Record(None, None)
+            else:
+                raise ValueError("Unknown container {} at {}".format(token, match.start()))
+            containers.append(value)
+            opened = True
+        elif token == ']':
+            closed = stack.pop()[0]
+            if isinstance(closed, Record) and closed.values is None:
+                raise ValueError("Incomplete record at {}".format(match.start()))
+            continue
+        elif token[0] == '/' and stack and isinstance(stack[-1][0], dict) and stack[-1][1] is None:
+            stack[-1][1] = token[1:]
+            continue
+        else:
+            if token[0] == "'":
+                value = token[1:-1]
+            elif token[0] == '@':
+                value = containers[int(token[1:])]
+            elif token[0] == '#':
+                value = token == '#1'
+            elif INTEGER.match(token):
+                value = int(token)
+            else:
+                value = LmcFloat(token)
+            opened = False
+
+        # Attach the value to its parent
+        if not stack:
+            root = value
+        else:
+            parent = stack[-1]
+            if isinstance(parent[0], dict):
+                parent[0][parent[1]] = value
+                parent[1] = None
+            elif isinstance(parent[0], list):
+                parent[0].append(value)
+            elif parent[0].schema is None:
+                parent[0].schema = value
+            elif parent[0].values is None:
+                parent[0].values = value
+            else:
+                raise ValueError("Record with more than two entries at {}".format(match.start()))
+
+        if opened:
+            stack.append([value, None])
+
+    if stack:
+        raise ValueError("Unexpected end of file, {} containers left open".format(len(stack)))
+    return root
+
+
+def format_lmc(tree):
+    """
+    Serializes a tree produced by parse_lmc, renumbering shared record schemas.
+
+    Parameters:
+    - tree: Nested dicts, lists and Record objects.
+
+    Returns:
+    - text (str): File contents to be encoded with ENCODING.
+    """
+    tokens = []
+    numbers = {}  # id of an emitted dictionary -> container number
+    count = 0
+
+    def emit(value):
+        nonlocal count
+        if isinstance(value, dict):
+            count += 1
+            numbers[id(value)] = count
+            tokens.append('[D')
+            for key, item in value.items():
+                tokens.append('/' + key)
+                emit(item)
+            tokens.append(']')
+        elif isinstance(value, list):
+            count += 1
+            tokens.append('[A')
+            for item in value:
+                emit(item)
+            tokens.append(']')
+        elif isinstance(value, Record):
+            count += 1
+            tokens.append('[R')
+            if id(value.schema) in numbers:
+                tokens.append('@{}'.format(numbers[id(value.schema)]))
+            else:
+                emit(value.schema)
+            emit(value.values)
+            tokens.append(']')
+        elif value is None:
+            tokens.append('@0')
+        elif isinstance(value, bool):
+            tokens.append('#1' if value else '#0')
+        elif isinstance(value, str):
+            tokens.append("'" + value + "'")
+        elif isinstance(value, LmcFloat):
+            tokens.append(value.text)
+        elif isinstance(value, (int, np.integer)):
+            tokens.append(str(int(value)))
+        else:
+            tokens.append(repr(float(value)))
+
+    # Recursion depth is bounded by the nesting of the file (about ten levels)
+    emit(tree)
+    return ' '.join(tokens) + ' '
+
+
+def read_lmc(file_name):
+    with open(file_name, encoding=ENCODING, newline='') as f:
+        return parse_lmc(f.read())
+
+
+def write_lmc(tree, file_name):
+    with open(file_name, 'w', encoding=ENCODING, newline='') as f:
+        f.write(format_lmc(tree))
+
+
+def config_items(tree):
+    """Returns the list of sections (parameters, variables, curves, ...) of the configuration."""
+    for item in tree['Items']:
+        if item['Info']['Type'] == 'LinMot configuration':
+            return item['Items']
+    raise ValueError("No LinMot configuration in project")
+
+
+def get_curves(tree):
+    """Returns the curve sections of the configuration, in file order."""
+    return [item for item in config_items(tree) if item['Info']['Type'] == 'Curves']
+
+
+def curve_to_array(curve):
+    """Returns the setpoints of a curve section as positions in mm."""
+    return np.asarray(curve['Data']['Data'], dtype=float) / POSITION_SCALE
+
+
+def set_curve_data(curve, position, sampling_rate):
+    """
+    Replaces the setpoints of a curve section.
+
+    Parameters:
+    - curve (dict): Curve section from get_curves.
+    - position (numpy.ndarray): Position setpoints in mm, equally spaced in time.
+    - sampling_rate (float): Number of setpoints per second (Hz).
+    """
+    setpoints = np.rint(np.asarray(position, dtype=float) * POSITION_SCALE).astype(np.int64)
+    if np.any(np.abs(setpoints) >= 2**31):
+        raise ValueError("Curve position out of the drive's 32 bit range")
+
+    x_length = int(round((len(setpoints) - 1) * TIME_SCALE / sampling_rate))
+    info = curve['Data']['Info']
+    info['NoOfSetPoints'] = len(setpoints)
+    info['XLength'] = x_length
+    info['WizardType'] = 257  # curve imported from a table
+    info['WizardPar1'] = x_length
+    for i in range(2, 8):
+        info['WizardPar{}'.format(i)] = 0
+    info['Downloaded'] = False
+    curve['Data']['Data'] = setpoints.tolist()
+
+
+def set_curve(tree, name, position, sampling_rate, curve_id=None):
+    """
+    Replaces the curve with the given name (and ID), or appends a new curve after the last one.
+
+    Parameters:
+    - tree: Configuration from read_lmc.
+    - name (str): Curve name.
+    - position (numpy.ndarray): Position setpoints in mm, equally spaced in time.
+    - sampling_rate (float): Number of setpoints per second (Hz).
+    - curve_id (int or None): Curve ID, needed when different curves share the name.
+      None to match by name only, or to give a new curve the next free ID.
+
+    Returns:
+    - curve_id (int): ID of the curve, to be used in Rise/Fall Curve ID parameters and command tables.
+    """
+    name = quote(name)
+    curves = get_curves(tree)
+    matches = [curve for curve in curves
+               if curve['Info']['Name'] == name and (curve_id is None or curve['Data']['Info']['ID'] == curve_id)]
+    if matches:
+        ids = sorted(set(curve['Data']['Info']['ID'] for curve in matches))
+        if len(ids) > 1:
+            raise ValueError("Curves named '{}' have IDs {}, pass curve_id to choose one".format(name, ids))
+        # The same curve can be stored more than once (e.g. a copy downloaded to the drive)
+        for curve in matches:
+            set_curve_data(curve, position, sampling_rate)
+        return ids[0]
+
+    if not curves:
+        raise ValueError("Configuration has no curve to use as template")
+    used_ids = set(curve['Data']['Info']['ID'] for curve in curves)
+    if curve_id is None:
+        curve_id = max(used_ids) + 1
+    elif curve_id in used_ids:
+        raise ValueError("Curve ID {} is already used by another curve".format(curve_id))
+    template = curves[-1]
+    curve = {
+        'Info': dict(template['Info'], Name=name),
+        'Data': {
+            'Info': dict(template['Data']['Info'], CurveName=name, ID=curve_id),
+            'Data': [],
+        },
+    }
+    set_curve_data(curve, position, sampling_rate)
+
+    # Sections can compare equal, so the template is located by identity
+    items = config_items(tree)
+    index = next(i for i, item in enumerate(items) if item is template)
+    items.insert(index + 1, curve)
+    return curve_id
+
+
+def inject_curves(config_file, curves, output_file, sampling_rate):
+    """
+    Writes a copy of a configuration file with curves replaced or added.
+
+    Parameters:
+    - config_file (str): Source .lmc file.
+    - curves (dict): Curve name, or (name, curve ID) tuple -> position setpoints in mm.
+    - output_file (str): Destination .lmc file.
+    - sampling_rate (float): Number of setpoints per second (Hz).
+
+    Returns:
+    - curve_ids (dict): Same keys as curves -> curve ID.
+    """
+    tree = read_lmc(config_file)
+    curve_ids = {}
+    for key, position in curves.items():
+        name, curve_id = key if isinstance(key, tuple) else (key, None)
+        curve_ids[key] = set_curve(tree, name, position, sampling_rate, curve_id)
+    write_lmc(tree, output_file)
+    return curve_ids
+
+
+# Example usage
+if __name__ == "__main__":
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    curves = {os.path.splitext(os.path.basename(f))[0]: np.loadtxt(f, delimiter=',', ndmin=1) for f in PROFILE_FILES}
+
+    for config_file in CONFIG_FILES:
+        output_file = os.path.join(OUTPUT_DIR, config_file)
+        curve_ids = inject_curves(os.path.join(CONFIG_DIR, config_file), curves, output_file, SAMPLING_RATE)
+        for name, curve_id in curve_ids.items():
+            print("{}: curve '{}' has ID {}".format(output_file, name, curve_id))
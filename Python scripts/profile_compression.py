@@ -0,0 +1,208 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+# ------------CHANGE HERE---------------
+CSV_FILE = "motion_profile_100mms.csv"  # single position column, as written by the generators
+SAMPLING_RATE = 100  # Hz
+TOLERANCE = 0.005  # mm
+MAX_VELOCITY = 110  # mm/s, the profile cruises at 100 mm/s
+MAX_ACCELERATION = 11000  # mm/s², the profile reaches 10000 mm/s² between its samples
+# --------------------------------------
+
+
+def reconstruction_error(time, position, knot_time, knot_position):
+    """Returns the largest deviation (mm) of the linear interpolation through the knots from the profile."""
+    return np.max(np.abs(np.interp(time, knot_time, knot_position) - position))
+
+
+def segment_limits(knot_time, knot_position):
+    """
+    Returns the velocity of each linear segment and the acceleration at each inner knot.
+
+    Parameters:
+    - knot_time (numpy.ndarray): Knot times in seconds.
+    - knot_position (numpy.ndarray): Knot positions in mm.
+
+    Returns:
+    - velocity (numpy.ndarray): Segment velocities in mm/s (one less than the knots).
+    - acceleration (numpy.ndarray): Change of velocity at the inner knots in mm/s² (two less than the knots).
+    """
+    velocity = np.diff(knot_position) / np.diff(knot_time)
+    acceleration = np.diff(velocity) / (0.5 * (knot_time[2:] - knot_time[:-2]))
+    return velocity, acceleration
+
+
+def achieved_limits(knot_time, knot_position):
+    """Returns the largest absolute velocity (mm/s) and acceleration (mm/s²) of the piecewise linear curve."""
+    velocity, acceleration = segment_limits(knot_time, knot_position)
+    return np.max(np.abs(velocity)), np.max(np.abs(acceleration), initial=0.0)
+
+
+def _largest_error(time, position, start, stop):
+    # Index and size of the largest deviation from the chord between samples start and stop
+    t = time[start + 1:stop]
+    chord = position[start] + (position[stop] - position[start]) * (t - time[start]) / (time[stop] - time[start])
+    error = np.abs(position[start + 1:stop] - chord)
+    i = np.argmax(error)
+    return start + 1 + i, error[i]
+
+
+def compress_profile(time, position, tolerance, max_velocity=None, max_acceleration=None):
+    """
+    Reduces a sampled profile to the knots of a piecewise linear curve with the Ramer-Douglas-Peucker algorithm.
+
+    Knots are added until the curve stays within the position tolerance and, where the original samples allow it,
+    within the velocity and acceleration limits. A profile that breaks the limits itself still breaks them
+    after compression, so check the returned max_velocity and max_acceleration.
+
+    Parameters:
+    - time (numpy.ndarray): Time array in seconds.
+    - position (numpy.ndarray): Position array in mm.
+    - tolerance (float): Largest allowed position error in mm.
+    - max_velocity (float or None): Velocity limit in mm/s, None to ignore.
+    - max_acceleration (float or None): Acceleration limit in mm/s², None to ignore.
+
+    Returns:
+    - knot_time (numpy.ndarray): Time of the kept setpoints.
+    - knot_position (numpy.ndarray): Position of the kept setpoints.
+    - max_error (float): Largest deviation of the reconstructed curve from the profile in mm.
+    - max_velocity (float): Largest absolute velocity of the reconstructed curve in mm/s.
+    - max_acceleration (float): Largest absolute acceleration of the reconstructed curve in mm/s².
+    """
+    time = np.asarray(time, dtype=float)
+    position = np.asarray(position, dtype=float)
+    keep = np.zeros(len(position), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    # Split segments at their worst sample until every sample is within tolerance
+    segments = [(0, len(position) - 1)]
+    while segments:
+        start, stop = segments.pop()
+        if stop - start < 2:
+            continue
+        i, error = _largest_error(time, position, start, stop)
+        if error > tolerance:
+            keep[i] = True
+            segments.append((start, i))
+            segments.append((i, stop))
+
+    # Split segments next to knots that break the velocity or acceleration limit
+    while max_velocity is not None or max_acceleration is not None:
+        knots = np.flatnonzero(keep)
+        velocity, acceleration = segment_limits(time[knots], position[knots])
+        violating = np.zeros(len(velocity), dtype=bool)
+        if max_velocity is not None:
+            violating |= np.abs(velocity) > max_velocity
+        if max_acceleration is not None:
+            corner = np.abs(acceleration) > max_acceleration
+            violating[:-1] |= corner
+            violating[1:] |= corner
+        violating &= np.diff(knots) > 1  # segments between neighbouring samples cannot be refined
+        if not np.any(violating):
+            break
+        for start, stop in zip(knots[:-1][violating], knots[1:][violating]):
+            i, error = _largest_error(time, position, start, stop)
+            keep[i if error > 0 else (start + stop) // 2] = True
+
+    knot_time = time[keep]
+    knot_position = position[keep]
+    max_error = reconstruction_error(time, position, knot_time, knot_position)
+    return (knot_time, knot_position, max_error) + achieved_limits(knot_time, knot_position)
+
+
+def _grid_error(samples, step):
+    # Largest deviation of the chords between every step-th sample, len(samples) - 1 must be a multiple of step
+    segments = samples[:-1].reshape(-1, step)
+    starts = samples[:-1:step]
+    chord = starts[:, None] + (samples[step::step] - starts)[:, None] * (np.arange(step) / step)
+    return np.max(np.abs(segments - chord))
+
+
+def decimate_profile(time, position, tolerance, max_velocity=None, max_acceleration=None):
+    """
+    Finds the fewest equally spaced setpoints, taken every n-th sample of the profile, that reproduce it
+    within the tolerance, as needed for the drive's curve tables.
+
+    The error is not monotonic in the spacing, so every n is tried, coarsest first. Each candidate is first
+    checked at the middle of its intervals, which rejects most of them in O(len(position) / n).
+    When n does not divide the profile, the last position is held for the rest of the final step: the curve
+    gets up to n - 1 samples longer and the error includes the hold, so a profile that still moves at its end
+    usually needs a step that divides it. Keeping the setpoints on samples never worsens the velocity and
+    acceleration compared to the original sampling, which is used when no coarser grid meets the limits.
+
+    Parameters:
+    - time (numpy.ndarray): Time array in seconds, equally spaced.
+    - position (numpy.ndarray): Position array in mm.
+    - tolerance (float): Largest allowed position error in mm.
+    - max_velocity (float or None): Velocity limit in mm/s, None to ignore.
+    - max_acceleration (float or None): Acceleration limit in mm/s², None to ignore.
+
+    Returns:
+    - grid_position (numpy.ndarray): Equally spaced setpoints in mm, starting at the first sample
+      and ending at the last one.
+    - sampling_rate (float): Number of setpoints per second (Hz).
+    - max_error (float): Largest deviation of the reconstructed curve from the profile in mm.
+    - max_velocity (float): Largest absolute velocity of the reconstructed curve in mm/s.
+    - max_acceleration (float): Largest absolute acceleration of the reconstructed curve in mm/s².
+    """
+    time = np.asarray(time, dtype=float)
+    position = np.asarray(position, dtype=float)
+    num_steps = len(position) - 1
+    sample_period = (time[-1] - time[0]) / num_steps
+    held = np.concatenate((position, np.full(num_steps, position[-1])))
+
+    # Coarsest spacing first, the original sampling (step 1) is the fallback
+    for step in range(num_steps, 0, -1):
+        samples = held[:-(-num_steps // step) * step + 1]
+        grid_position = samples[::step]
+        middle = step // 2
+        chord = grid_position[:-1] + (grid_position[1:] - grid_position[:-1]) * (middle / step)
+        if np.max(np.abs(samples[middle:-1:step] - chord)) > tolerance:
+            continue
+        max_error = _grid_error(samples, step)
+        if max_error > tolerance:
+            continue
+        velocity, acceleration = achieved_limits(np.arange(len(grid_position)) * step * sample_period, grid_position)
+        if step > 1 and max_velocity is not None and velocity > max_velocity:
+            continue
+        if step > 1 and max_acceleration is not None and acceleration > max_acceleration:
+            continue
+        break
+
+    return grid_position, 1 / (step * sample_period), max_error, velocity, acceleration
+
+
+# Example usage
+if __name__ == "__main__":
+    position = np.loadtxt(CSV_FILE, delimiter=',', ndmin=1)
+    time = np.arange(len(position)) / SAMPLING_RATE
+
+    knot_time, knot_position, max_error, max_velocity, max_acceleration = compress_profile(
+        time, position, TOLERANCE, MAX_VELOCITY, MAX_ACCELERATION)
+    print("Knots: {} of {} setpoints, max error {:.4f} mm, max velocity {:.1f} mm/s, max acceleration {:.0f} mm/s²".format(
+        len(knot_time), len(position), max_error, max_velocity, max_acceleration))
+
+    grid_position, sampling_rate, grid_error, grid_velocity, grid_acceleration = decimate_profile(
+        time, position, TOLERANCE, MAX_VELOCITY, MAX_ACCELERATION)
+    print("Equally spaced: {} of {} setpoints at {:.2f} Hz, max error {:.4f} mm, max velocity {:.1f} mm/s, max acceleration {:.0f} mm/s²".format(
+        len(grid_position), len(position), sampling_rate, grid_error, grid_velocity, grid_acceleration))
+    if max(max_velocity, grid_velocity) > MAX_VELOCITY or max(max_acceleration, grid_acceleration) > MAX_ACCELERATION:
+        print("Warning: the profile itself exceeds the velocity or acceleration limit")
+
+    # Plot the profile, the kept knots and the reconstruction error
+    fig, axs = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+
+    axs[0].plot(time, position, label='Profile', color='blue')
+    axs[0].plot(knot_time, knot_position, marker='o', markersize=3, linestyle='-', label='Knots', color='red')
+    axs[0].set_ylabel('Position (mm)')
+    axs[0].grid(True)
+    axs[0].legend()
+
+    axs[1].plot(time, np.interp(time, knot_time, knot_position) - position, label='Knot error', color='red')
+    axs[1].set_xlabel('Time (s)')
+    axs[1].set_ylabel('Error (mm)')
+    axs[1].grid(True)
+    axs[1].legend()
+
+    plt.tight_layout()
+    plt.show()
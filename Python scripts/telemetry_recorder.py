@@ -0,0 +1,187 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+# ------------CHANGE HERE---------------
+COM_PORT = 'COM3'
+RECORDING_FILE = "telemetry.lmrec"
+# Each read_pos is a 5 byte request and a 16 byte response, about 5.5 ms at 38400 baud,
+# so the RS232 link cannot sample faster than about 180 Hz
+RECORDING_RATE = 100  # Hz
+RECORDING_TIME = 10  # seconds
+CHUNK_SIZE = 1000  # samples per compressed chunk
+NUM_CHUNKS = 16  # chunks held in the ring buffer
+# --------------------------------------
+
+# One telemetry sample: time (s), position (mm), velocity (m/s), force (N) and drive status word
+SAMPLE_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('position', '<f8'),
+    ('velocity', '<f8'),
+    ('force', '<f8'),
+    ('status', '<u2'),
+])
+
+FILE_MAGIC = b'LMTREC01'
+FILE_HEADER = struct.Struct('<8sI')  # magic, chunk size
+CHUNK_HEADER = struct.Struct('<4sII')  # marker, number of samples, compressed length
+CHUNK_MARKER = b'CHNK'
+
+
+class TelemetryRecorder:
+    """
+    Records timestamped drive samples into a preallocated ring buffer and writes full chunks,
+    zlib compressed, to an append-only file from a background thread.
+
+    The file consists of a header followed by independent chunks, so it can be read with
+    read_recording while the recorder is still running.
+    """
+    def __init__(self, file_name, chunk_size=CHUNK_SIZE, num_chunks=NUM_CHUNKS, compression_level=1):
+        self.file_name = file_name
+        self.chunk_size = chunk_size
+        self.num_chunks = num_chunks
+        self.compression_level = compression_level
+        self.buffer = np.zeros(chunk_size * num_chunks, dtype=SAMPLE_DTYPE)
+        self.num_recorded = 0  # samples written into the ring
+        self.num_flushed = 0  # samples released by the writer thread
+        self.num_dropped = 0  # samples lost because the writer fell a whole ring behind
+        self.chunks = queue.Queue()
+        self.thread = None
+        self.t0 = None
+
+    def start(self):
+        self.file = open(self.file_name, 'wb')
+        self.file.write(FILE_HEADER.pack(FILE_MAGIC, self.chunk_size))
+        self.file.flush()
+        self.t0 = time.perf_counter()
+        self.thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self.thread.start()
+        return self
+
+    def record(self, position, velocity=np.nan, force=np.nan, status=0, timestamp=None):
+        """
+        Stores one sample. Never blocks: if the writer thread is a whole ring behind, the sample is dropped.
+
+        Parameters:
+        - position (float): Actual position in mm.
+        - velocity (float): Actual velocity in m/s.
+        - force (float): Measured force in N.
+        - status (int): Drive status word.
+        - timestamp (float or None): Sample time in seconds, None to use the time since start().
+        """
+        if self.num_recorded - self.num_flushed >= len(self.buffer):
+            self.num_dropped += 1
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter() - self.t0
+
+        index = self.num_recorded % len(self.buffer)
+        self.buffer[index] = (timestamp, position, velocity, force, status)
+        self.num_recorded += 1
+
+        if self.num_recorded % self.chunk_size == 0:
+            self.chunks.put((index + 1 - self.chunk_size, self.chunk_size))
+
+    def stop(self):
+        """Writes the partially filled chunk, waits for the writer thread and closes the file."""
+        remainder = self.num_recorded % self.chunk_size
+        if remainder:
+            self.chunks.put(((self.num_recorded - remainder) % len(self.buffer), remainder))
+        self.chunks.put(None)
+        self.thread.join()
+        self.file.close()
+
+    def _write_chunks(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            start, count = chunk
+            data = zlib.compress(self.buffer[start:start + count].tobytes(), self.compression_level)
+            self.file.write(CHUNK_HEADER.pack(CHUNK_MARKER, count, len(data)) + data)
+            self.file.flush()
+            self.num_flushed += count
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def iter_chunks(file_name, offset=0):
+    """
+    Yields the complete chunks of a recording, stopping quietly at a header or chunk that is still being written.
+
+    Parameters:
+    - file_name (str): Recording written by TelemetryRecorder.
+    - offset (int): Byte offset of the first chunk to read, 0 to start after the file header.
+
+    Yields:
+    - samples (numpy.ndarray): Structured array with SAMPLE_DTYPE fields.
+    - offset (int): Byte offset of the next chunk, to resume reading a growing file.
+    """
+    with open(file_name, 'rb') as f:
+        if offset == 0:
+            header = f.read(FILE_HEADER.size)
+            if len(header) < FILE_HEADER.size:
+                return  # file created, header not written yet
+            magic, _ = FILE_HEADER.unpack(header)
+            if magic != FILE_MAGIC:
+                raise ValueError("{} is not a telemetry recording".format(file_name))
+            offset = FILE_HEADER.size
+        f.seek(offset)
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                return
+            marker, count, length = CHUNK_HEADER.unpack(header)
+            if marker != CHUNK_MARKER:
+                raise ValueError("Corrupt chunk at byte {} of {}".format(offset, file_name))
+            data = f.read(length)
+            if len(data) < length:
+                return
+            offset += CHUNK_HEADER.size + length
+            yield np.frombuffer(zlib.decompress(data), dtype=SAMPLE_DTYPE, count=count), offset
+
+
+def read_recording(file_name):
+    """
+    Reads every complete chunk of a recording, including one that is still being written to.
+
+    Parameters:
+    - file_name (str): Recording written by TelemetryRecorder.
+
+    Returns:
+    - samples (numpy.ndarray): Structured array with SAMPLE_DTYPE fields.
+    """
+    chunks = [samples for samples, _ in iter_chunks(file_name)]
+    if not chunks:
+        return np.zeros(0, dtype=SAMPLE_DTYPE)
+    return np.concatenate(chunks)
+
+
+# Example usage
+if __name__ == "__main__":
+    from LinRS_sample import Kobling, Driver
+
+    con = Kobling(COM_PORT).connect()
+    lin = Driver(con, '01')
+
+    # The RS232 protocol only reads back the position; velocity and force stay NaN and the status word 0
+    with TelemetryRecorder(RECORDING_FILE) as recorder:
+        tick = time.perf_counter()
+        for i in range(RECORDING_TIME * RECORDING_RATE):
+            tick += 1 / RECORDING_RATE
+            recorder.record(lin.read_pos(verbose=False))
+            remaining = tick - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+    con.close()
+
+    samples = read_recording(RECORDING_FILE)
+    print("Recorded {} samples ({} dropped) into {} bytes".format(len(samples), recorder.num_dropped, os.path.getsize(RECORDING_FILE)))
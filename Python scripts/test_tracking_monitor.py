@@ -0,0 +1,121 @@
+import numpy as np
+from base64 import b16decode
+
+from LinRS_sample import Driver
+from tracking_monitor import TrackingMonitor
+from trajectory_interpolator import TrajectoryInterpolator, stream_profile
+
+OFF_TELEGRAM = b16decode("0101050200013E0004")
+OUTPUT_RATE = 100  # Hz
+
+
+class StandInConnection:
+    """Serial port stand-in: records every telegram and answers position requests with a drive that does not move."""
+    baudrate = 38400
+    in_waiting = 0
+
+    def __init__(self, position):
+        self.set_position(position)
+        self.written = []
+
+    def set_position(self, position):
+        # read_pos takes the position from hex digits 22-29 of the response, in swapped order
+        digits = '{:08X}'.format(int(round(position * 10000)))
+        word = ['0'] * 32
+        for i, j in zip((29, 28, 26, 27, 24, 25, 22, 23), range(8)):
+            word[i] = digits[j]
+        self.response = b16decode(''.join(word))
+        self.index = 0
+
+    def write(self, data):
+        self.written.append(data)
+        self.index = 0
+
+    def read(self):
+        byte = self.response[self.index:self.index + 1]
+        self.index += 1
+        return byte
+
+
+class FollowingConnection(StandInConnection):
+    """Serial port stand-in for a drive that reaches every setpoint one cycle after it was sent."""
+    def __init__(self, position):
+        super().__init__(position)
+        self.setpoint = position
+
+    def write(self, data):
+        if is_setpoint(data):
+            self.set_position(self.setpoint)
+            self.setpoint = int.from_bytes(data[-5:-1], 'big') / 10000
+        super().write(data)
+
+
+def is_setpoint(data):
+    return data[3:5] == b'\x09\x02'
+
+
+def ramp(start, stop, duration=1.0):
+    # 100 Hz profile moving from start to stop
+    position = np.linspace(start, stop, int(duration * 100) + 1)
+    return TrajectoryInterpolator.from_profile(position, 100)
+
+
+def setpoint_telegrams(connection):
+    return [data for data in connection.written if is_setpoint(data)]
+
+
+def test_stalled_drive_aborts_stream():
+    connection = StandInConnection(40)
+    driver = Driver(connection, '01')
+    monitor = TrackingMonitor(driver.stop)
+
+    stream_profile(driver, ramp(40, 45), OUTPUT_RATE, monitor)
+
+    assert monitor.aborted
+    assert monitor.reason.startswith('tracking error')
+    assert monitor.abort_error is None
+    assert connection.written[-1] == OFF_TELEGRAM
+    # 1 mm of the 5 mm ramp is reached after about a fifth of the 101 setpoints
+    assert len(setpoint_telegrams(connection)) < 30
+
+
+def test_failing_abort_still_stops_stream():
+    connection = StandInConnection(40)
+    driver = Driver(connection, '01')
+
+    def abort():
+        raise IOError("port closed")
+
+    monitor = TrackingMonitor(abort)
+    stream_profile(driver, ramp(40, 45), OUTPUT_RATE, monitor)
+
+    assert monitor.aborted
+    assert monitor.reason.startswith('tracking error')
+    assert isinstance(monitor.abort_error, IOError)
+    assert len(setpoint_telegrams(connection)) < 30
+
+
+def test_tracking_drive_streams_whole_profile():
+    connection = StandInConnection(40)
+    driver = Driver(connection, '01')
+    monitor = TrackingMonitor(driver.stop)
+
+    skipped = stream_profile(driver, ramp(40, 40.5), OUTPUT_RATE, monitor)
+
+    assert not monitor.aborted
+    assert OFF_TELEGRAM not in connection.written
+    assert len(setpoint_telegrams(connection)) + skipped == OUTPUT_RATE + 1
+
+
+def test_drive_one_cycle_behind_does_not_abort():
+    # 100 mm/s at 100 Hz: every reading is 1 mm behind the setpoint sent just before it
+    connection = FollowingConnection(40)
+    driver = Driver(connection, '01')
+    monitor = TrackingMonitor(driver.stop)
+
+    skipped = stream_profile(driver, ramp(40, 60, 0.2), OUTPUT_RATE, monitor)
+
+    assert skipped == 0
+    assert not monitor.aborted
+    assert max(-monitor.error_stats.min, monitor.error_stats.max) < 1e-3
+    assert len(setpoint_telegrams(connection)) == 21
@@ -0,0 +1,117 @@
+import math
+from collections import deque
+
+# ------------CHANGE HERE---------------
+MAX_TRACKING_ERROR = 1.0  # mm
+MAX_FORCE = 50  # N
+MAX_VELOCITY = 250  # mm/s
+VELOCITY_SMOOTHING = 0.2  # weight of the newest sample in the velocity estimate (0 < x <= 1)
+TRACKING_DELAY = 1  # cycles, the position is read right after a setpoint is sent, so it follows the previous one
+# --------------------------------------
+
+
+class RunningStats:
+    """Mean, standard deviation and extremes of a stream, updated in O(1) per sample (Welford's algorithm)."""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count > 1 else 0.0
+
+
+class TrackingMonitor:
+    """
+    Compares commanded setpoints with drive readings while a profile runs and aborts on the first
+    sample that exceeds a limit.
+    """
+    def __init__(self, abort, max_tracking_error=MAX_TRACKING_ERROR, max_force=MAX_FORCE, max_velocity=MAX_VELOCITY,
+                 velocity_smoothing=VELOCITY_SMOOTHING, delay=TRACKING_DELAY):
+        """
+        Parameters:
+        - abort (callable): Called once when a limit is exceeded, e.g. driver.stop. Exceptions it raises
+          are caught and kept in abort_error, so the run still counts as aborted.
+        - max_tracking_error (float or None): Largest allowed |actual - commanded| position in mm.
+        - max_force (float or None): Largest allowed |force| in N.
+        - max_velocity (float or None): Largest allowed |velocity estimate| in mm/s.
+        - velocity_smoothing (float): Weight of the newest finite difference in the velocity estimate.
+        - delay (int): Number of cycles between a commanded setpoint and the reading it is compared with,
+          0 to compare with the setpoint of the same cycle.
+        """
+        self.abort = abort
+        self.max_tracking_error = max_tracking_error
+        self.max_force = max_force
+        self.max_velocity = max_velocity
+        self.velocity_smoothing = velocity_smoothing
+        self.commanded = deque(maxlen=delay + 1)  # oldest entry is the setpoint the reading is compared with
+        self.error_stats = RunningStats()
+        self.force_stats = RunningStats()
+        self.velocity = 0.0
+        self.last_time = None
+        self.last_position = None
+        self.aborted = False
+        self.reason = None
+        self.abort_error = None
+
+    def update(self, t, commanded, position, force=math.nan):
+        """
+        Processes one control cycle.
+
+        Parameters:
+        - t (float): Sample time in seconds.
+        - commanded (float): Position commanded in this cycle in mm.
+        - position (float): Actual position in mm.
+        - force (float): Measured force in N, NaN when not read.
+
+        Returns:
+        - ok (bool): False once the monitor has aborted the run.
+        """
+        if self.aborted:
+            return False
+
+        self.commanded.append(commanded)
+        error = position - self.commanded[0]
+        self.error_stats.update(error)
+        if not math.isnan(force):
+            self.force_stats.update(force)
+        if self.last_time is not None and t > self.last_time:
+            raw_velocity = (position - self.last_position) / (t - self.last_time)
+            self.velocity += self.velocity_smoothing * (raw_velocity - self.velocity)
+        self.last_time = t
+        self.last_position = position
+
+        if self.max_tracking_error is not None and abs(error) > self.max_tracking_error:
+            self.trigger("tracking error {:.3f} mm at {:.3f} s".format(error, t))
+        elif self.max_force is not None and abs(force) > self.max_force:
+            self.trigger("force {:.2f} N at {:.3f} s".format(force, t))
+        elif self.max_velocity is not None and abs(self.velocity) > self.max_velocity:
+            self.trigger("velocity {:.1f} mm/s at {:.3f} s".format(self.velocity, t))
+        return not self.aborted
+
+    def trigger(self, reason):
+        self.aborted = True
+        self.reason = reason
+        print('Abort: ' + reason)
+        try:
+            self.abort()
+        except Exception as e:
+            self.abort_error = e
+            print('Abort failed: {!r}'.format(e))
+
+    def summary(self):
+        return ("Tracking error: mean {:.4f} mm, std {:.4f} mm, range [{:.4f}, {:.4f}] mm over {} samples"
+                .format(self.error_stats.mean, self.error_stats.std, self.error_stats.min, self.error_stats.max, self.error_stats.count))
@@ -0,0 +1,194 @@
+import time
+from bisect import bisect_right
+import numpy as np
+from base64 import b16decode
+from scipy.interpolate import PchipInterpolator
+
+# ------------CHANGE HERE---------------
+COM_PORT = 'COM3'
+CSV_FILE = "motion_profile_random_velocity.csv"
+SAMPLING_RATE = 100  # Hz, rate of the stored profile
+OUTPUT_RATE = 100  # Hz, rate of the streamed setpoints, at most about 115 Hz with a tracking monitor
+# --------------------------------------
+
+BAUD_RATE = 38400  # default of LinRS_sample.Kobling
+BITS_PER_BYTE = 10  # 8 data bits with start and stop bit
+SETPOINT_BYTES = 12  # Driver.telegramPstream
+POSITION_READ_BYTES = 21  # Driver.read_pos request and response
+SPIN_TIME = 0.002  # s, the last part of each wait is spent polling the clock, sleep is not that precise
+
+
+class TrajectoryInterpolator:
+    """
+    Evaluates a piecewise cubic trajectory at an arbitrary output rate.
+
+    The polynomial coefficients of every segment are computed once, so each setpoint only costs
+    a segment index update and a Horner evaluation.
+    """
+    def __init__(self, breakpoints, coefficients, min_position=-np.inf, max_position=np.inf):
+        """
+        Parameters:
+        - breakpoints (numpy.ndarray): Segment boundaries in seconds, shape (n + 1,).
+        - coefficients (numpy.ndarray): Polynomial coefficients, highest power first, shape (4, n),
+          in the layout of scipy.interpolate.CubicSpline.c.
+        - min_position (float): Lower position limit in mm, setpoints are clipped to it.
+        - max_position (float): Upper position limit in mm, setpoints are clipped to it.
+        """
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.min_position = min_position
+        self.max_position = max_position
+        # Plain Python floats are faster than NumPy scalars for one setpoint at a time
+        self.segment_starts = self.breakpoints.tolist()
+        self.segment_coefficients = self.coefficients.T.tolist()
+        self.duration = self.segment_starts[-1] - self.segment_starts[0]
+
+    @classmethod
+    def from_profile(cls, position, sampling_rate, **kwargs):
+        """
+        Builds the interpolator from a stored profile sampled at sampling_rate (Hz).
+
+        The shape-preserving PCHIP interpolant does not overshoot the samples, so the trajectory stays within
+        the stroke of the profile, where a cubic spline overshoots the corners of trapezoidal profiles.
+        """
+        time = np.arange(len(position)) / sampling_rate
+        return cls.from_spline(PchipInterpolator(time, position), **kwargs)
+
+    @classmethod
+    def from_spline(cls, spline, **kwargs):
+        """Builds the interpolator from a scipy CubicSpline or PchipInterpolator, e.g. the spline fitted in Random_Motion.py."""
+        if spline.c.shape[0] != 4:
+            raise ValueError("Expected cubic segments, got order {}".format(spline.c.shape[0] - 1))
+        return cls(spline.x, spline.c, **kwargs)
+
+    def evaluate(self, t):
+        """Returns the position (mm) at the times t (s), for offline use."""
+        t = np.clip(np.asarray(t, dtype=float), self.breakpoints[0], self.breakpoints[-1])
+        segment = np.clip(np.searchsorted(self.breakpoints, t, side='right') - 1, 0, len(self.segment_coefficients) - 1)
+        dt = t - self.breakpoints[segment]
+        c = self.coefficients[:, segment]
+        return np.clip(((c[0] * dt + c[1]) * dt + c[2]) * dt + c[3], self.min_position, self.max_position)
+
+    def seek(self, t):
+        """Returns the index of the segment containing the time t (s) since the start of the trajectory, in O(log n)."""
+        t += self.segment_starts[0]
+        return min(max(bisect_right(self.segment_starts, t) - 1, 0), len(self.segment_coefficients) - 1)
+
+    def position_at(self, t, segment=0):
+        """
+        Returns the position at the time t (s) since the start of the trajectory, searching forward from segment.
+
+        Returns:
+        - position (float): Setpoint in mm.
+        - segment (int): Segment containing t, to start from for the next, later time.
+        """
+        starts = self.segment_starts
+        t = min(t + starts[0], starts[-1])
+        last = len(self.segment_coefficients) - 1
+        while segment < last and t >= starts[segment + 1]:
+            segment += 1
+        a, b, c, d = self.segment_coefficients[segment]
+        dt = t - starts[segment]
+        position = ((a * dt + b) * dt + c) * dt + d
+        return min(max(position, self.min_position), self.max_position), segment
+
+    def setpoints(self, output_rate):
+        """
+        Yields the setpoints of the whole trajectory at output_rate (Hz).
+
+        Yields:
+        - t (float): Time since the start of the trajectory in seconds.
+        - position (float): Setpoint in mm.
+        """
+        starts = self.segment_starts
+        last = len(self.segment_coefficients) - 1
+        segment = 0
+        a, b, c, d = self.segment_coefficients[0]
+        for k in range(int(self.duration * output_rate) + 1):
+            t = starts[0] + k / output_rate
+            # Time only moves forward, so the segment index is updated incrementally
+            while segment < last and t >= starts[segment + 1]:
+                segment += 1
+                a, b, c, d = self.segment_coefficients[segment]
+            dt = t - starts[segment]
+            position = ((a * dt + b) * dt + c) * dt + d
+            yield t - starts[0], min(max(position, self.min_position), self.max_position)
+
+
+def max_output_rate(baud_rate=BAUD_RATE, monitored=False):
+    """Returns the highest setpoint rate (Hz) the serial link carries, with or without a position read per setpoint."""
+    telegram_bytes = SETPOINT_BYTES + (POSITION_READ_BYTES if monitored else 0)
+    return baud_rate / (BITS_PER_BYTE * telegram_bytes)
+
+
+def stream_profile(driver, interpolator, output_rate, monitor=None):
+    """
+    Streams the trajectory to the drive with Driver.telegramPstream, one setpoint every 1 / output_rate seconds.
+
+    A setpoint is always taken at the time it is sent: when the loop falls behind, the overdue setpoints
+    are skipped instead of being sent late, so the drive never trails the trajectory.
+
+    Parameters:
+    - driver (Driver): Drive connection from LinRS_sample.
+    - interpolator (TrajectoryInterpolator): Trajectory to stream.
+    - output_rate (float): Setpoint rate (Hz), at most max_output_rate for the baud rate of the connection.
+    - monitor (TrackingMonitor or None): Checked with the actual position after every setpoint,
+      streaming stops as soon as it aborts.
+
+    Returns:
+    - skipped (int): Number of setpoints that were skipped because they were overdue.
+    """
+    limit = max_output_rate(getattr(driver.connection, 'baudrate', BAUD_RATE), monitor is not None)
+    if output_rate > limit:
+        raise ValueError("Output rate {} Hz exceeds the {:.0f} Hz the serial link carries".format(output_rate, limit))
+
+    last = int(interpolator.duration * output_rate)
+    skipped = 0
+    k = 0
+    segment = 0
+    t0 = time.perf_counter()
+    while k <= last:
+        t = k / output_rate
+        now = time.perf_counter() - t0
+        if now < t:
+            # Sleep for most of the wait so other threads get the GIL, then poll for the exact time
+            if t - now > SPIN_TIME:
+                time.sleep(t - now - SPIN_TIME)
+            while now < t:
+                now = time.perf_counter() - t0
+        else:
+            # Jump to the latest setpoint that is due and evaluate the trajectory now
+            due = min(int(now * output_rate), last)
+            skipped += due - k
+            k = due
+            t = min(now, interpolator.duration)
+            # The segment cursor only moves forward, after a jump it is placed again
+            segment = interpolator.seek(t)
+
+        position, segment = interpolator.position_at(t, segment)
+        driver.connection.write(b16decode(driver.telegramPstream(position)))
+        if monitor is not None and not monitor.update(now, position, driver.read_pos(verbose=False)):
+            break
+        k += 1
+    return skipped
+
+
+# Example usage
+if __name__ == "__main__":
+    from LinRS_sample import Kobling, Driver
+    from tracking_monitor import TrackingMonitor
+
+    data = np.loadtxt(CSV_FILE, delimiter=',', skiprows=1)
+    interpolator = TrajectoryInterpolator.from_profile(data[:, 1], SAMPLING_RATE)
+
+    con = Kobling(COM_PORT).connect()
+    lin = Driver(con, '01')
+    lin.switch('on')
+    monitor = TrackingMonitor(lin.stop)
+
+    skipped = stream_profile(lin, interpolator, OUTPUT_RATE, monitor)
+    print("Streamed {:.2f} s at {} Hz, {} setpoints skipped".format(interpolator.duration, OUTPUT_RATE, skipped))
+    print(monitor.summary())
+
+    lin.switch('off')
+    con.close()